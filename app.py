@@ -1,16 +1,44 @@
-from flask import Flask, render_template, request
+from flask import Flask, jsonify, render_template, request
 import pandas as pd
 import pickle
+import os
+
+from src.schema import read_csv, apply_schema
+from src.pipeline.predict_pipeline import explain_predictions, get_feature_origins, get_path_contribution_tables
+from src.components.model_monitoring import InferenceMonitor
 
 app = Flask(__name__)
 
-# Load the preprocessor
-with open('artifacts/proprocessor.pkl', 'rb') as f:
-    preprocessor = pickle.load(f)
+PREPROCESSOR_PATH = 'artifacts/proprocessor.pkl'
+# LightGBM threads per prediction, 0 keeps LightGBM's default; gunicorn.conf.py sets
+# it in each worker after fork since the master runs single-threaded
+predict_num_threads = int(os.environ.get('PREDICT_NUM_THREADS', 0))
+# Set MODEL_PATH=artifacts/compact_model.pkl to serve the compacted variant
+MODEL_PATH = os.environ.get('MODEL_PATH', 'artifacts/model.pkl')
+
+def load_artifacts():
+    global preprocessor, model, monitor
+
+    # Load the preprocessor
+    with open(PREPROCESSOR_PATH, 'rb') as f:
+        new_preprocessor = pickle.load(f)
+
+    # Load the model
+    with open(MODEL_PATH, 'rb') as f:
+        new_model = pickle.load(f)
+
+    # Build the explanation tables up front (in the master under gunicorn, so the
+    # workers share them) instead of on the first explain request
+    get_path_contribution_tables(getattr(new_model, 'booster_', new_model),
+                                 tuple(get_feature_origins(new_preprocessor)))
+
+    # Fresh inference monitor against the reference profile of this training run
+    new_monitor = InferenceMonitor.from_reference_file()
 
-# Load the model
-with open('artifacts/model.pkl', 'rb') as f:
-    model = pickle.load(f)
+    # Swap them together so a request never sees a mismatched pair
+    preprocessor, model, monitor = new_preprocessor, new_model, new_monitor
+
+load_artifacts()
 
 @app.route('/')
 def home():
@@ -22,19 +50,37 @@ def predict():
     file = request.files['file']
 
     # Read the uploaded file
-    data = pd.read_csv(file)
+    data = read_csv(file)
 
-    # Preprocess the data using the preprocessor
-    preprocessed_data = preprocess_data(data)
+    if request.form.get('explain'):
+        # Per-feature path contributions add up to the prediction, so one pass gives both
+        explanation = explain_predictions(model, preprocessor, data, **predict_kwargs())
+        predictions = explanation.sum(axis=1).values
+    else:
+        # Preprocess the data using the preprocessor
+        preprocessed_data = preprocess_data(data)
 
-    # Make predictions using the model
-    predictions = make_predictions(preprocessed_data)
+        # Make predictions using the model
+        predictions = make_predictions(preprocessed_data)
+        explanation = pd.DataFrame(index=data.index)
+
+    # Record what the model saw and returned, in fixed memory
+    if monitor is not None:
+        monitor.update(data, predictions)
 
     # Combine the predictions with the original data
-    result_df = pd.concat([data[['Store', 'Date']], pd.DataFrame(predictions, columns=['Expected Sales'])], axis=1)
+    result_df = pd.concat([data[['Store', 'Date']], pd.DataFrame(predictions, columns=['Expected Sales']),
+                           explanation.round(2)], axis=1)
     result_data = result_df.values.tolist()
 
-    return render_template('result.html', result=result_data)
+    return render_template('result.html', columns=list(result_df.columns), result=result_data)
+
+@app.route('/monitoring')
+def monitoring():
+    # Drift of the traffic all workers have scored against the training reference profile
+    if monitor is None:
+        return jsonify({'error': 'No reference profile, retrain to enable monitoring'}), 404
+    return jsonify(monitor.aggregate().drift_scores())
 
 def preprocess_data(data):
     # Select the required columns
@@ -43,18 +89,22 @@ def preprocess_data(data):
                'CompetitionDistance', 'CompetitionOpenSinceMonth',
                'CompetitionOpenSinceYear', 'Promo2', 'Promo2SinceWeek',
                'Promo2SinceYear', 'PromoInterval']
-    data = data[columns]
+    data = apply_schema(data[columns])
 
     # Preprocess the data using the preprocessor
     preprocessed_data = preprocessor.transform(data)
 
     return preprocessed_data
 
+def predict_kwargs():
+    return {'num_threads': predict_num_threads} if predict_num_threads else {}
+
 def make_predictions(data):
     # Make predictions using the model
-    predictions = model.predict(data)
+    predictions = model.predict(data, **predict_kwargs())
 
     return predictions
 
 if __name__ == '__main__':
+    # Development server only; use `gunicorn app:app` (see gunicorn.conf.py) in production
     app.run(debug=True)
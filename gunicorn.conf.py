@@ -0,0 +1,97 @@
+import gc
+import os
+import signal
+import threading
+import time
+
+# Production serving: `gunicorn app:app`
+# The master imports app.py once (preload_app) so the model and preprocessor are
+# unpickled a single time and the forked workers share those pages copy-on-write.
+
+# Cores this process may run on, which respects CPU affinity and cpuset limits
+_cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', _cores))
+preload_app = True
+timeout = 120
+graceful_timeout = 30
+
+# LightGBM threads per worker: PREDICT_NUM_THREADS, a user-set OMP_NUM_THREADS, or
+# an even split of the cores so the workers' OpenMP threads don't fight over them
+if os.environ.get('OMP_NUM_THREADS', '1') != '1':
+    os.environ.setdefault('PREDICT_NUM_THREADS', os.environ['OMP_NUM_THREADS'])
+_threads_per_worker = int(os.environ.get('PREDICT_NUM_THREADS', 0)) or max(1, _cores // workers)
+
+# The master must never start an OpenMP thread pool: its threads don't survive fork
+# and a worker then hangs in its first predict. This runs before the master imports
+# the app (and lightgbm), so it loads the artifacts single-threaded; each worker gets
+# its share through LightGBM's num_threads predict parameter in post_fork instead.
+os.environ['OMP_NUM_THREADS'] = '1'
+for _var in ('OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_var, str(_threads_per_worker))
+
+# Seconds between checks for new artifacts, 0 disables the watcher
+_artifact_poll_interval = float(os.environ.get('ARTIFACT_POLL_INTERVAL', 5))
+# Seconds the new artifacts must stay unchanged before the workers are reloaded
+_artifact_settle_seconds = float(os.environ.get('ARTIFACT_SETTLE_SECONDS', 30))
+
+
+def _artifact_mtimes():
+    import app
+    return {path: os.path.getmtime(path) if os.path.exists(path) else None
+            for path in (app.PREPROCESSOR_PATH, app.MODEL_PATH)}
+
+
+def _watch_artifacts(server):
+    # Training writes the preprocessor long before the model, so only reload once
+    # both have been replaced and neither has changed for the settle period;
+    # reloading in between would pair the new preprocessor with the old model
+    loaded_mtimes = seen_mtimes = _artifact_mtimes()
+    seen_since = time.monotonic()
+    while True:
+        time.sleep(_artifact_poll_interval)
+        mtimes = _artifact_mtimes()
+        if mtimes != seen_mtimes:
+            seen_mtimes, seen_since = mtimes, time.monotonic()
+            continue
+
+        all_replaced = all(mtime is not None and mtime != loaded_mtimes[path] for path, mtime in mtimes.items())
+        if all_replaced and time.monotonic() - seen_since >= _artifact_settle_seconds:
+            loaded_mtimes = mtimes
+            server.log.info("New artifacts detected, reloading workers")
+            # SIGHUP makes the master call on_reload, fork fresh workers and only
+            # then retire the old ones gracefully, so no request is dropped
+            os.kill(server.pid, signal.SIGHUP)
+
+
+def when_ready(server):
+    if _artifact_poll_interval > 0:
+        threading.Thread(target=_watch_artifacts, args=(server,), daemon=True).start()
+
+
+def on_reload(server):
+    import app
+    try:
+        app.load_artifacts()
+        server.log.info("Loaded new artifacts")
+    except Exception:
+        server.log.exception("Failed to load new artifacts, keeping the current ones")
+
+
+def post_fork(server, worker):
+    import app
+    app.predict_num_threads = _threads_per_worker
+
+
+def worker_exit(server, worker):
+    # Final snapshot so /monitoring keeps the traffic of retired workers
+    import app
+    if app.monitor is not None:
+        app.monitor.write_snapshot()
+
+
+def pre_fork(server, worker):
+    # Move the loaded objects out of the collected generations so garbage
+    # collections in the workers don't write to, and un-share, their pages
+    gc.freeze()
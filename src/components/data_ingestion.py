@@ -2,6 +2,7 @@ import os
 import sys
 from src.exception import CustomException
 from src.logger import logging
+from src.schema import read_csv, apply_schema, memory_usage_mb
 import pandas as pd
 
 from sklearn.model_selection import train_test_split
@@ -12,6 +13,8 @@ from src.components.data_transformation import DataTransformation
 
 from src.components.model_trainer import ModelTrainerConfig
 from src.components.model_trainer import ModelTrainer
+
+from src.components.model_compaction import ModelCompaction
 @dataclass
 class DataIngestionConfig:
     train_data_path: str=os.path.join('artifacts',"train.csv")
@@ -26,15 +29,16 @@ class DataIngestion:
         logging.info("Entered the data ingestion method or component")
         try:
             #df=pd.read_csv('notebook\data\stud.csv')
-            df_1=pd.read_csv("C:\\Users\\deepk\\OneDrive\\Desktop\\Mahajan WorkSpace\\Second operating Project (Github)\\notebook\\data\\Rossmann Stores Data.csv",low_memory=False)
-            df_2=pd.read_csv("C:\\Users\\deepk\\OneDrive\\Desktop\\Mahajan WorkSpace\\Second operating Project (Github)\\notebook\\data\\store.csv",low_memory=False)
+            df_1=read_csv("C:\\Users\\deepk\\OneDrive\\Desktop\\Mahajan WorkSpace\\Second operating Project (Github)\\notebook\\data\\Rossmann Stores Data.csv",low_memory=False)
+            df_2=read_csv("C:\\Users\\deepk\\OneDrive\\Desktop\\Mahajan WorkSpace\\Second operating Project (Github)\\notebook\\data\\store.csv",low_memory=False)
             df=pd.merge(df_1, df_2, on='Store', how='inner')
             df = df[(df.Sales > 0)].reset_index(drop=True)
 
-            # Covert State holiday from categorical to booleans for simplicity. 
-            df['StateHoliday'] = df['StateHoliday'].replace(['0','a','b','c'],[0,1,1,1])
+            # State holiday is converted from categorical to booleans by the schema;
+            # re-apply it after the merge so the joined frame stays compact.
+            df = apply_schema(df)
 
-            logging.info('Read the dataset and merged as dataframe')
+            logging.info(f'Read the dataset and merged as dataframe ({memory_usage_mb(df):.1f} MB)')
 
             os.makedirs(os.path.dirname(self.ingestion_config.train_data_path),exist_ok=True)
 
@@ -67,5 +71,8 @@ if __name__=="__main__":
     modeltrainer=ModelTrainer()
     print(modeltrainer.initiate_model_trainer(train_arr,test_arr))
 
+    modelcompaction=ModelCompaction()
+    print(modelcompaction.initiate_model_compaction(train_arr,test_arr))
+
 
 
@@ -14,11 +14,20 @@ from src.exception import CustomException
 from src.logger import logging
 import os
 
-from src.utils import save_object
+from src.utils import save_object,iter_chunks,stratified_reservoir_sample,transform_in_chunks
+from src.schema import read_csv,CATEGORICAL_DTYPES
+from src.components.model_monitoring import InferenceMonitor,ModelMonitorConfig
 
 @dataclass
 class DataTransformationConfig:
     preprocessor_obj_file_path=os.path.join('artifacts',"proprocessor.pkl")
+    # Fit the preprocessor on a stratified sample of this many rows instead of the
+    # full training set. None keeps the original full fit.
+    fit_sample_size: int=None
+    fit_strata_columns=('StoreType','Assortment')
+    chunk_size: int=100_000
+    # Also run a full fit and log how far the sampled parameters drift from it
+    report_fit_drift: bool=False
 
 class DataTransformation:
     def __init__(self):
@@ -38,8 +47,10 @@ class DataTransformation:
                                          ('power_transform', PowerTransformer(copy=False))])
 
             # Create a pipeline for categorical columns
+            # Categories come from the schema so a sampled fit cannot miss a rare level
+            categories = [sorted(CATEGORICAL_DTYPES[col].categories) for col in categorical_cols]
             categorical_pipeline = Pipeline([('imputer', SimpleImputer(strategy='most_frequent')),
-                                             ('onehot', OneHotEncoder())])
+                                             ('onehot', OneHotEncoder(categories=categories))])
 
             # Combine the numeric and categorical pipelines using ColumnTransformer
             com_pipeline = ColumnTransformer([('numeric', numeric_pipeline, numeric_cols),
@@ -57,11 +68,71 @@ class DataTransformation:
            except Exception as e:
               raise CustomException(e,sys)
         
+    def fit_transform_sampled(self,preprocessing_obj,input_feature_df):
+        '''
+        Fit the preprocessor on a stratified reservoir sample of input_feature_df
+        and transform the full frame chunk by chunk.
+        '''
+        try:
+            config=self.data_transformation_config
+            sample_df=stratified_reservoir_sample(
+                iter_chunks(input_feature_df,config.chunk_size),
+                sample_size=config.fit_sample_size,
+                strata_cols=list(config.fit_strata_columns)
+            )
+            logging.info(f"Fitting preprocessor on a sample of {len(sample_df)} out of {len(input_feature_df)} rows")
+
+            preprocessing_obj.fit(sample_df)
+
+            if config.report_fit_drift:
+                full_obj=self.get_data_transformer_object().fit(input_feature_df)
+                # Compare the outputs on rows the sampled fit never saw
+                probe_df=input_feature_df.drop(index=sample_df.index).iloc[:config.chunk_size]
+                drift=self.get_fit_drift(preprocessing_obj,full_obj,probe_df)
+                logging.info(f"Sampled preprocessor drift from full fit: {drift}")
+
+            return transform_in_chunks(preprocessing_obj,input_feature_df,config.chunk_size)
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def get_fit_drift(self,sampled_obj,full_obj,probe_df):
+        '''
+        How far a sampled preprocessor is from the full fit. Imputer medians and scaler
+        bounds are compared relative to the full fit's scale and the Yeo-Johnson lambdas
+        directly; the output keys compare both transforms of probe_df, which also covers
+        the power transform's standardization.
+        '''
+        try:
+            def numeric_step(obj,step):
+                return obj.named_steps['combined_pipeline'].named_transformers_['numeric'].named_steps[step]
+
+            full_median=numeric_step(full_obj,'imputer').statistics_
+            full_range=full_obj.named_steps['scaler'].data_range_
+            full_range=np.where(full_range==0,1,full_range)
+            output_diff=np.abs(sampled_obj.transform(probe_df)-full_obj.transform(probe_df))
+
+            return {
+                'imputer_median':float(np.max(np.abs(numeric_step(sampled_obj,'imputer').statistics_-full_median)
+                                              /np.maximum(np.abs(full_median),1))),
+                'yeo_johnson_lambda':float(np.max(np.abs(numeric_step(sampled_obj,'power_transform').lambdas_
+                                                         -numeric_step(full_obj,'power_transform').lambdas_))),
+                'scaler_min':float(np.max(np.abs(sampled_obj.named_steps['scaler'].data_min_
+                                                 -full_obj.named_steps['scaler'].data_min_)/full_range)),
+                'scaler_max':float(np.max(np.abs(sampled_obj.named_steps['scaler'].data_max_
+                                                 -full_obj.named_steps['scaler'].data_max_)/full_range)),
+                'output_max_abs':float(output_diff.max()),
+                'output_mean_abs':float(output_diff.mean()),
+            }
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
     def initiate_data_transformation(self,train_path,test_path=None):
 
         try:
-            train_df=pd.read_csv(train_path)
-            test_df=pd.read_csv(test_path)
+            train_df=read_csv(train_path)
+            test_df=read_csv(test_path)
 
             logging.info("Read train and test data completed")
 
@@ -86,8 +157,12 @@ class DataTransformation:
                 f"Applying preprocessing object on training dataframe and testing dataframe."
             )
 
-            input_feature_train_arr=preprocessing_obj.fit_transform(input_feature_train_df)
-            input_feature_test_arr=preprocessing_obj.transform(input_feature_test_df)
+            if self.data_transformation_config.fit_sample_size:
+                input_feature_train_arr=self.fit_transform_sampled(preprocessing_obj,input_feature_train_df)
+            else:
+                input_feature_train_arr=preprocessing_obj.fit_transform(input_feature_train_df)
+            input_feature_test_arr=transform_in_chunks(preprocessing_obj,input_feature_test_df,
+                                                       self.data_transformation_config.chunk_size)
 
             train_arr = np.c_[
                 input_feature_train_arr, np.array(target_feature_train_df)
@@ -103,6 +178,14 @@ class DataTransformation:
 
             )
 
+            # Reference profile the inference monitor compares live traffic against
+            monitor_config=ModelMonitorConfig()
+            save_object(
+                file_path=monitor_config.reference_profile_file_path,
+                obj=InferenceMonitor.from_training_data(input_feature_train_df,target_feature_train_df,monitor_config)
+            )
+            logging.info(f"Saved inference monitoring reference profile.")
+
             return (
                 train_arr,
                 test_arr,
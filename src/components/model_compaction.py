@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import pickle
+from dataclasses import dataclass, field
+
+import numpy as np
+from lightgbm import Booster, LGBMRegressor
+from sklearn.metrics import r2_score
+
+from src.exception import CustomException
+from src.logger import logging
+
+from src.utils import save_object,load_object
+
+@dataclass
+class ModelCompactionConfig:
+    trained_model_file_path: str=os.path.join("artifacts","model.pkl")
+    compact_model_file_path: str=os.path.join("artifacts","compact_model.pkl")
+    # p99 single-row scoring latency the saved variant has to meet
+    latency_budget_ms: float=2.0
+    # Largest drop in test R2 from the full model a compact variant may have
+    r2_tolerance: float=0.005
+    truncated_tree_counts: tuple=(50,100,200)
+    distilled_params: dict=field(default_factory=lambda: {
+        "n_estimators": 150, "num_leaves": 63, "learning_rate": 0.1,
+        "min_child_samples": 20, "verbose": -1
+    })
+    benchmark_rows: int=500
+
+class ModelCompaction:
+    def __init__(self):
+        self.model_compaction_config=ModelCompactionConfig()
+
+    def get_compact_variants(self,model,X_train):
+        '''This function builds the smaller variants of the trained LightGBM model'''
+        try:
+            # Variants are compared as bare boosters so the sklearn wrapper's input
+            # validation does not dominate single-row latency
+            booster=model.booster_
+            variants={"full": booster}
+
+            # Truncated: keep only the first n boosting iterations
+            for n_trees in self.model_compaction_config.truncated_tree_counts:
+                if n_trees<booster.current_iteration():
+                    variants[f"truncated_{n_trees}"]=Booster(model_str=booster.model_to_string(num_iteration=n_trees))
+
+            # Distilled: a shallower model trained on the full model's predictions
+            distilled=LGBMRegressor(**self.model_compaction_config.distilled_params)
+            distilled.fit(X_train,model.predict(X_train))
+            variants["distilled"]=distilled.booster_
+
+            return variants
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def benchmark_variant(self,model,X_test,y_test):
+        '''Single-row latency percentiles, pickled size and test R2 of one variant'''
+        try:
+            rows=X_test[:self.model_compaction_config.benchmark_rows]
+            latencies=[]
+            for i in range(len(rows)):
+                start=time.perf_counter()
+                model.predict(rows[i:i+1])
+                latencies.append((time.perf_counter()-start)*1000)
+
+            return {
+                "p50_ms": float(np.percentile(latencies,50)),
+                "p99_ms": float(np.percentile(latencies,99)),
+                "size_kb": len(pickle.dumps(model))/1024,
+                "r2": r2_score(y_test,model.predict(X_test)),
+            }
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def select_variant(self,report):
+        '''
+        Fastest compact variant that meets the latency budget and stays within
+        r2_tolerance of the full model, or None. The full model itself is only the baseline
+        and is saved by initiate_model_compaction when nothing qualifies.
+        '''
+        config=self.model_compaction_config
+        candidates=[name for name,scores in report.items()
+                    if name!="full"
+                    and scores["p99_ms"]<=config.latency_budget_ms
+                    and scores["r2"]>=report["full"]["r2"]-config.r2_tolerance]
+        if not candidates:
+            return None
+        return min(candidates,key=lambda name: (report[name]["p99_ms"],report[name]["size_kb"]))
+
+    def initiate_model_compaction(self,train_array,test_array):
+        try:
+            X_train,X_test,y_test=(
+                train_array[:,:-1],
+                test_array[:,:-1],
+                test_array[:,-1]
+            )
+            model=load_object(file_path=self.model_compaction_config.trained_model_file_path)
+
+            logging.info("Building compact model variants")
+            variants=self.get_compact_variants(model,X_train)
+
+            report={name: self.benchmark_variant(variant,X_test,y_test) for name,variant in variants.items()}
+            for name,scores in report.items():
+                logging.info(f"{name}: {scores}")
+
+            best_variant_name=self.select_variant(report)
+            if best_variant_name is None:
+                # A compact model left over from an earlier run would be served next to
+                # the preprocessor this run just fitted, so replace it with the full model
+                best_variant_name="full"
+                logging.info("No compact variant is within the latency budget and R2 tolerance, "
+                             "saving the full model's booster as the compact model")
+            else:
+                logging.info(f"Selected compact model variant {best_variant_name}")
+
+            save_object(
+                file_path=self.model_compaction_config.compact_model_file_path,
+                obj=variants[best_variant_name]
+            )
+
+            return best_variant_name,report
+
+        except Exception as e:
+            raise CustomException(e,sys)
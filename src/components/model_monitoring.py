@@ -0,0 +1,303 @@
+import copy
+import glob
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+
+from src.utils import load_object,save_object
+
+@dataclass
+class ModelMonitorConfig:
+    reference_profile_file_path: str=os.path.join("artifacts","reference_profile.pkl")
+    numeric_columns: tuple=('Customers','CompetitionDistance','CompetitionOpenSinceYear')
+    sketch_columns: tuple=('Store','StoreType')
+    # Histogram bins per numeric column, cut at the reference quantiles
+    n_bins: int=10
+    # Count-min sketch size; width must be a power of two
+    cms_width: int=2048
+    cms_depth: int=4
+    # Each serving process writes its summary here for /monitoring to merge, None disables it
+    snapshot_dir: str=os.path.join("artifacts","monitoring")
+    # Seconds between snapshot writes of a process that keeps scoring
+    snapshot_interval_seconds: float=30.0
+
+class RunningMoments:
+    '''Count, mean and sum of squared deviations, merged batch by batch (Chan et al.)'''
+    def __init__(self):
+        self.count=0
+        self.mean=0.0
+        self.m2=0.0
+        self.missing=0
+
+    def update(self,values):
+        values=np.asarray(values,dtype=np.float64)
+        finite=values[~np.isnan(values)]
+        self.missing+=len(values)-len(finite)
+        if len(finite)==0:
+            return
+        batch_mean=finite.mean()
+        self._combine(len(finite),batch_mean,((finite-batch_mean)**2).sum())
+
+    def merge(self,other):
+        self.missing+=other.missing
+        if other.count:
+            self._combine(other.count,other.mean,other.m2)
+
+    def _combine(self,count,mean,m2):
+        total=self.count+count
+        delta=mean-self.mean
+        self.mean+=delta*count/total
+        self.m2+=m2+delta**2*self.count*count/total
+        self.count=total
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2/self.count) if self.count else 0.0
+
+class QuantileHistogram:
+    '''Counts of values between fixed cut points taken from the reference quantiles'''
+    def __init__(self,edges):
+        self.edges=np.asarray(edges,dtype=np.float64)
+        self.counts=np.zeros(len(self.edges)+1,dtype=np.int64)
+
+    def update(self,values):
+        values=np.asarray(values,dtype=np.float64)
+        values=values[~np.isnan(values)]
+        self.counts+=np.bincount(np.searchsorted(self.edges,values,side='right'),minlength=len(self.counts))
+
+    def merge(self,other):
+        if not np.array_equal(self.edges,other.edges):
+            raise ValueError("Only histograms with the same edges can be merged")
+        self.counts+=other.counts
+
+    def proportions(self):
+        total=self.counts.sum()
+        return self.counts/total if total else self.counts.astype(np.float64)
+
+class CountMinSketch:
+    '''Approximate per-key counts in depth x width counters, independent of the number of keys'''
+    def __init__(self,width,depth,seed=42):
+        if width&(width-1):
+            raise ValueError("Count-min sketch width must be a power of two")
+        rng=np.random.default_rng(seed)
+        self.shift=np.uint64(64-int(np.log2(width)))
+        self.seeds=rng.integers(0,2**63,depth,dtype=np.uint64)
+        self.multipliers=rng.integers(0,2**63,depth,dtype=np.uint64)|np.uint64(1)
+        self.table=np.zeros((depth,width),dtype=np.int64)
+        self.total=0
+
+    def _indices(self,values):
+        keys=pd.util.hash_pandas_object(pd.Series(values).astype(str),index=False).values
+        # Multiply-shift hashing, one row of counters per seed
+        with np.errstate(over='ignore'):
+            return ((keys[None,:]^self.seeds[:,None])*self.multipliers[:,None])>>self.shift
+
+    def update(self,values):
+        indices=self._indices(values)
+        width=self.table.shape[1]
+        for row,row_indices in enumerate(indices):
+            self.table[row]+=np.bincount(row_indices.astype(np.int64),minlength=width)
+        self.total+=indices.shape[1]
+
+    def query(self,values):
+        indices=self._indices(values).astype(np.int64)
+        return self.table[np.arange(len(self.table))[:,None],indices].min(axis=0)
+
+    def merge(self,other):
+        # Counters line up only when both sketches hash with the same seeds
+        if (self.table.shape!=other.table.shape or not np.array_equal(self.seeds,other.seeds)
+                or not np.array_equal(self.multipliers,other.multipliers)):
+            raise ValueError("Only count-min sketches with the same size and seeds can be merged")
+        self.table+=other.table
+        self.total+=other.total
+
+class InferenceMonitor:
+    '''
+    Streaming summary of the features the model scores and the predictions it returns.
+
+    Memory is fixed by the config: running moments and a quantile histogram per numeric
+    column and for the predictions, plus a count-min sketch per key column. drift_scores
+    compares the summary with the reference profile built from the training data.
+    State is per process: every process periodically writes a snapshot of it to
+    config.snapshot_dir, and aggregate merges the snapshots of all processes that
+    monitor against the same reference profile.
+    '''
+    def __init__(self,reference=None,config=None):
+        self.config=config or (reference.config if reference is not None else ModelMonitorConfig())
+        self.reference=reference
+        self.columns=list(self.config.numeric_columns)+['prediction']
+        edges=reference.edges if reference is not None else {column: [] for column in self.columns}
+        self.edges=edges
+        self.moments={column: RunningMoments() for column in self.columns}
+        self.histograms={column: QuantileHistogram(edges[column]) for column in self.columns}
+        self.sketches={column: CountMinSketch(self.config.cms_width,self.config.cms_depth)
+                       for column in self.config.sketch_columns}
+        self.reference_frequencies={}
+        # Modification time of the reference profile file, which tells apart snapshots
+        # taken against different training runs
+        self.reference_version=None
+        self.snapshot_path=None
+        self.last_snapshot=time.monotonic()
+        self.lock=threading.Lock()
+
+    @classmethod
+    def from_training_data(cls,features,target,config=None):
+        '''Reference profile: the training features and target summarised like live traffic'''
+        try:
+            config=config or ModelMonitorConfig()
+            reference=cls(config=config)
+            quantiles=np.linspace(0,1,config.n_bins+1)[1:-1]
+            columns={column: features[column] for column in config.numeric_columns}
+            columns['prediction']=target
+            reference.edges={column: np.unique(np.nanquantile(np.asarray(values,dtype=np.float64),quantiles))
+                             for column,values in columns.items()}
+            reference.histograms={column: QuantileHistogram(reference.edges[column]) for column in reference.columns}
+            reference.update(features,target)
+            # Exact key frequencies of the training data, compared against the live sketch estimates
+            reference.reference_frequencies={column: features[column].astype(str).value_counts(normalize=True)
+                                             for column in config.sketch_columns}
+            return reference
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    @classmethod
+    def from_reference_file(cls,file_path=None):
+        '''Empty monitor for the saved reference profile, or None when there is no profile yet'''
+        file_path=file_path or ModelMonitorConfig().reference_profile_file_path
+        if not os.path.exists(file_path):
+            logging.info(f"No reference profile at {file_path}, inference monitoring disabled")
+            return None
+        monitor=cls(reference=load_object(file_path))
+        monitor.reference_version=os.stat(file_path).st_mtime_ns
+        return monitor
+
+    def update(self,features,predictions):
+        try:
+            with self.lock:
+                for column in self.config.numeric_columns:
+                    if column in features.columns:
+                        values=features[column].to_numpy(dtype=np.float64,na_value=np.nan)
+                        self.moments[column].update(values)
+                        self.histograms[column].update(values)
+                self.moments['prediction'].update(predictions)
+                self.histograms['prediction'].update(predictions)
+                for column,sketch in self.sketches.items():
+                    if column in features.columns:
+                        sketch.update(features[column])
+
+            if time.monotonic()-self.last_snapshot>=self.config.snapshot_interval_seconds:
+                self.write_snapshot()
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def merge(self,other):
+        '''Add the traffic summarised by another monitor with the same config to this one'''
+        try:
+            with self.lock:
+                for column in self.columns:
+                    self.moments[column].merge(other.moments[column])
+                    self.histograms[column].merge(other.histograms[column])
+                for column,sketch in self.sketches.items():
+                    sketch.merge(other.sketches[column])
+            return self
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def write_snapshot(self):
+        '''Save this process's summary, without the reference profile, to the snapshot directory'''
+        try:
+            if self.config.snapshot_dir is None or self.reference_version is None:
+                return
+            with self.lock:
+                if self.snapshot_path is None:
+                    # Named once per process, after any fork, so a restarted worker that
+                    # reuses a pid does not overwrite its predecessor's traffic
+                    self.snapshot_path=os.path.join(self.config.snapshot_dir,
+                                                    f"{self.reference_version}-{os.getpid()}-{time.time_ns()}.pkl")
+                snapshot=copy.copy(self)
+                snapshot.reference=None
+                save_object(file_path=self.snapshot_path,obj=snapshot)
+                self.last_snapshot=time.monotonic()
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def aggregate(self):
+        '''
+        New monitor holding the traffic of every process that wrote a snapshot against
+        this reference profile, including processes that have since exited. This process
+        is snapshotted first; the others are at most snapshot_interval_seconds behind.
+        '''
+        try:
+            if self.config.snapshot_dir is None or self.reference_version is None:
+                return self
+            self.write_snapshot()
+            aggregated=InferenceMonitor(self.reference,self.config)
+            aggregated.reference_version=self.reference_version
+            for file_path in glob.glob(os.path.join(self.config.snapshot_dir,f"{self.reference_version}-*.pkl")):
+                aggregated.merge(load_object(file_path))
+            return aggregated
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def drift_scores(self):
+        '''
+        Per column: population stability index of the quantile histogram and the mean
+        shift in reference standard deviations; per key column: total variation distance
+        between the reference frequencies and the sketch estimates.
+        '''
+        try:
+            if self.reference is None:
+                raise ValueError("Drift scores need a reference profile")
+
+            scores={}
+            with self.lock:
+                for column in self.columns:
+                    moments,reference_moments=self.moments[column],self.reference.moments[column]
+                    if moments.count==0:
+                        continue
+                    actual=np.clip(self.histograms[column].proportions(),1e-6,None)
+                    expected=np.clip(self.reference.histograms[column].proportions(),1e-6,None)
+                    scores[column]={
+                        'psi': float(np.sum((actual-expected)*np.log(actual/expected))),
+                        'mean_shift': float(abs(moments.mean-reference_moments.mean)/(reference_moments.std or 1.0)),
+                        'count': moments.count,
+                    }
+
+                for column,sketch in self.sketches.items():
+                    if sketch.total==0:
+                        continue
+                    expected=self.reference.reference_frequencies[column]
+                    estimated=sketch.query(expected.index.to_numpy())/sketch.total
+                    # Traffic on keys never seen in training counts fully towards the distance
+                    unseen=max(0.0,1.0-estimated.sum())
+                    scores[column]={
+                        'tv_distance': float(min(1.0,0.5*(np.abs(expected.to_numpy()-estimated).sum()+unseen))),
+                        'count': sketch.total,
+                    }
+
+            return scores
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def __getstate__(self):
+        state=self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        self.lock=threading.Lock()
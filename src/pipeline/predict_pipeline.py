@@ -1,13 +1,20 @@
 import sys
+import weakref
+import numpy as np
 import pandas as pd
 from src.exception import CustomException
 from src.utils import load_object
+from src.schema import apply_schema
+from src.components.data_transformation import DataTransformationConfig
+from src.components.model_monitoring import InferenceMonitor
+from sklearn.pipeline import Pipeline
 import os
 
 
 class PredictPipeline:
     def __init__(self):
-        pass
+        # Streaming summary of what the model scores, None until training saved a reference profile
+        self.monitor=InferenceMonitor.from_reference_file()
 
     def predict(self,features):
         try:
@@ -17,13 +24,127 @@ class PredictPipeline:
             model=load_object(file_path=model_path)
             preprocessor=load_object(file_path=preprocessor_path)
             print("After Loading")
+            features=apply_schema(features)
             data_scaled=preprocessor.transform(features)
             preds=model.predict(data_scaled)
+            if self.monitor is not None:
+                self.monitor.update(features,preds)
             return preds
         
         except Exception as e:
             raise CustomException(e,sys)
 
+    def explain(self,features):
+        try:
+            model_path=os.path.join("artifacts","model.pkl")
+            preprocessor_path=DataTransformationConfig().preprocessor_obj_file_path
+            model=load_object(file_path=model_path)
+            preprocessor=load_object(file_path=preprocessor_path)
+            return explain_predictions(model,preprocessor,features)
+
+        except Exception as e:
+            raise CustomException(e,sys)
+
+
+def get_feature_origins(preprocessor):
+    '''Name of the input column behind every column the preprocessor outputs'''
+    column_transformer=preprocessor.named_steps['combined_pipeline']
+    origins=[]
+    for name,transformer,columns in column_transformer.transformers_:
+        if transformer=='drop':
+            continue
+        # One-hot encoding turns a column into one output per category; the imputers,
+        # power transform and final MinMaxScaler all map columns one to one
+        encoder=transformer.named_steps.get('onehot') if isinstance(transformer,Pipeline) else None
+        if encoder is not None:
+            for column,categories in zip(columns,encoder.categories_):
+                origins.extend([column]*len(categories))
+        else:
+            origins.extend(columns)
+    return origins
+
+# Path contribution tables per booster, built once from its model dump
+_path_contribution_tables=weakref.WeakKeyDictionary()
+
+def get_path_contribution_tables(booster,origins):
+    '''
+    For every tree, a (leaves x columns) table holding how much each original column
+    moves the tree's output along the path from the root to that leaf: every split adds
+    (child value - node value) to its feature's column. Also returns the summed root
+    values, the part of each prediction no feature accounts for.
+    '''
+    cached=_path_contribution_tables.get(booster)
+    if cached is not None and cached[0]==origins:
+        return cached[1],cached[2]
+
+    columns=list(dict.fromkeys(origins))
+    column_index=[columns.index(origin) for origin in origins]
+
+    def node_value(node):
+        return node['internal_value'] if 'split_feature' in node else node['leaf_value']
+
+    tables=[]
+    base_value=0.0
+    for tree in booster.dump_model()['tree_info']:
+        root=tree['tree_structure']
+        base_value+=node_value(root)
+        table=np.zeros((tree['num_leaves'],len(columns)))
+        stack=[(root,np.zeros(len(columns)))]
+        while stack:
+            node,path=stack.pop()
+            if 'split_feature' not in node:
+                table[node.get('leaf_index',0)]=path
+                continue
+            for child in (node['left_child'],node['right_child']):
+                child_path=path.copy()
+                child_path[column_index[node['split_feature']]]+=node_value(child)-node['internal_value']
+                stack.append((child,child_path))
+        tables.append(table)
+
+    _path_contribution_tables[booster]=(origins,tables,base_value)
+    return tables,base_value
+
+def explain_predictions(model,preprocessor,features,method='path',**predict_params):
+    '''
+    Per-feature contribution of every predicted row, summed back onto the original
+    input columns; each row adds up to its prediction together with BaseValue.
+
+    method='path' (default) follows each row's decision path: one pred_leaf pass plus
+    a table lookup per tree, so it costs about as much as predicting. method='shap'
+    uses LightGBM's pred_contrib (TreeSHAP), which gives consistent Shapley values but
+    costs orders of magnitude more on deep trees.
+    '''
+    try:
+        booster=getattr(model,'booster_',model)
+        data_scaled=preprocessor.transform(apply_schema(features))
+
+        origins=get_feature_origins(preprocessor)
+        if len(origins)!=booster.num_feature():
+            raise ValueError(f"Model has {booster.num_feature()} features but the preprocessor outputs {len(origins)}")
+        columns=list(dict.fromkeys(origins))
+
+        if method=='shap':
+            contributions=booster.predict(data_scaled,pred_contrib=True,**predict_params)
+            indicator=np.zeros((len(origins),len(columns)))
+            indicator[np.arange(len(origins)),[columns.index(origin) for origin in origins]]=1
+            grouped=contributions[:,:-1]@indicator
+            base_value=contributions[:,-1]
+        elif method=='path':
+            leaves=booster.predict(data_scaled,pred_leaf=True,**predict_params).astype(np.intp)
+            tables,base_value=get_path_contribution_tables(booster,tuple(origins))
+            grouped=np.zeros((len(data_scaled),len(columns)))
+            for tree,table in enumerate(tables):
+                grouped+=table[leaves[:,tree]]
+        else:
+            raise ValueError(f"Unknown explanation method {method}, expected 'path' or 'shap'")
+
+        explanation=pd.DataFrame(grouped,columns=columns,index=features.index)
+        explanation['BaseValue']=base_value
+        return explanation
+
+    except Exception as e:
+        raise CustomException(e,sys)
+
 
 
 class CustomData:
@@ -0,0 +1,97 @@
+import sys
+
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+from src.exception import CustomException
+from src.logger import logging
+
+# Fixed category sets of the Rossmann store table. Declaring them up front keeps
+# the category codes identical between training, test and serving frames.
+CATEGORICAL_DTYPES = {
+    'StoreType': CategoricalDtype(categories=['a', 'b', 'c', 'd']),
+    'Assortment': CategoricalDtype(categories=['a', 'b', 'c']),
+    'PromoInterval': CategoricalDtype(categories=['Jan,Apr,Jul,Oct', 'Feb,May,Aug,Nov', 'Mar,Jun,Sept,Dec']),
+}
+
+# Dates repeat once per store, so a categorical stores each distinct day once.
+# ISO dates sort lexicographically, which keeps min/max meaningful when ordered.
+DATE_DTYPE = CategoricalDtype(ordered=True)
+
+# Narrowest numeric dtype that holds every value of the column. Anything but the
+# Store key can be blank in an upload (Sales always is when forecasting), so integer
+# columns use the nullable pandas dtypes and the store.csv measures stay floating
+# point; missing values survive until the imputer either way.
+NUMERIC_DTYPES = {
+    'Store': 'int16',
+    'DayOfWeek': 'Int8',
+    'Sales': 'Int32',
+    'Customers': 'Int32',
+    'Open': 'Int8',
+    'Promo': 'Int8',
+    'StateHoliday': 'Int8',
+    'SchoolHoliday': 'Int8',
+    'CompetitionDistance': 'float32',
+    'CompetitionOpenSinceMonth': 'float32',
+    'CompetitionOpenSinceYear': 'float32',
+    'Promo2': 'Int8',
+    'Promo2SinceWeek': 'float32',
+    'Promo2SinceYear': 'float32',
+}
+
+# State holidays are collapsed to a boolean flag: '0' means no holiday,
+# 'a' (public), 'b' (Easter) and 'c' (Christmas) all count as a holiday.
+STATE_HOLIDAY_CODES = {'0': 0, 'a': 1, 'b': 1, 'c': 1}
+
+
+def apply_schema(df):
+    '''
+    Cast the Rossmann columns present in df to their compact dtypes.
+    Columns that are not part of the schema are left untouched.
+    '''
+    try:
+        df = df.copy()
+
+        if 'StateHoliday' in df.columns and not pd.api.types.is_numeric_dtype(df['StateHoliday']):
+            df['StateHoliday'] = df['StateHoliday'].astype(str).map(STATE_HOLIDAY_CODES)
+
+        for col, dtype in NUMERIC_DTYPES.items():
+            if col in df.columns:
+                df[col] = df[col].astype(dtype)
+
+        for col, dtype in CATEGORICAL_DTYPES.items():
+            if col in df.columns:
+                values = df[col].astype(dtype)
+                # astype turns levels outside the category list into NaN, which the
+                # imputer would then silently fill, so reject them here instead
+                unknown = values.isna() & df[col].notna()
+                if unknown.any():
+                    raise ValueError(f"Unknown {col} values {sorted(df.loc[unknown, col].astype(str).unique())}, "
+                                     f"expected one of {list(dtype.categories)}")
+                df[col] = values
+
+        if 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+            df['Date'] = df['Date'].astype(DATE_DTYPE)
+
+        return df
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def memory_usage_mb(df):
+    '''Deep memory usage of df in megabytes, used for logging.'''
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def read_csv(file_path, **kwargs):
+    '''Read a Rossmann csv and return it in the compact schema.'''
+    try:
+        # Parse with inferred categories so apply_schema can still spot unknown levels
+        df = pd.read_csv(file_path, dtype={**{col: 'category' for col in CATEGORICAL_DTYPES}, 'Date': DATE_DTYPE}, **kwargs)
+        df = apply_schema(df)
+        logging.info(f"Read {file_path} with compact schema ({memory_usage_mb(df):.1f} MB)")
+        return df
+
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -17,8 +17,12 @@ def save_object(file_path, obj):
 
         os.makedirs(dir_path, exist_ok=True)
 
-        with open(file_path, "wb") as file_obj:
+        # Write to a temporary file and rename it into place so a reader (e.g. a
+        # serving process reloading artifacts) never sees a half-written pickle
+        tmp_file_path = file_path + ".tmp"
+        with open(tmp_file_path, "wb") as file_obj:
             pickle.dump(obj, file_obj)
+        os.replace(tmp_file_path, file_path)
             
     except Exception as e:
         raise CustomException(e, sys)
@@ -60,3 +64,56 @@ def load_object(file_path):
 
     except Exception as e:
         raise CustomException(e, sys)
+
+def iter_chunks(df, chunk_size):
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def stratified_reservoir_sample(chunks, sample_size, strata_cols, random_state=42):
+    '''
+    Draw a stratified sample of roughly sample_size rows from an iterable of
+    dataframe chunks in a single pass.
+
+    Every row gets a uniform random key and each stratum keeps only the rows with
+    the sample_size smallest keys, so memory stays bounded however long the history is.
+    Strata are then allocated proportionally to their row counts (at least one row each).
+    '''
+    try:
+        rng = np.random.default_rng(random_state)
+        key_col = "__reservoir_key"
+        reservoirs = {}
+        counts = {}
+
+        for chunk in chunks:
+            chunk = chunk.assign(**{key_col: rng.random(len(chunk))})
+            for stratum, group in chunk.groupby(strata_cols, observed=True, dropna=False):
+                counts[stratum] = counts.get(stratum, 0) + len(group)
+                if stratum in reservoirs:
+                    group = pd.concat([reservoirs[stratum], group])
+                reservoirs[stratum] = group.nsmallest(sample_size, key_col)
+
+        total = sum(counts.values())
+        sample = [
+            reservoirs[stratum].nsmallest(max(1, round(sample_size * count / total)), key_col)
+            for stratum, count in counts.items()
+        ]
+
+        return pd.concat(sample).drop(columns=[key_col])
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+def transform_in_chunks(transformer, df, chunk_size):
+    '''Apply a fitted transformer chunk by chunk into a single preallocated array.'''
+    try:
+        result = None
+        for start in range(0, len(df), chunk_size):
+            transformed = transformer.transform(df.iloc[start:start + chunk_size])
+            if result is None:
+                result = np.empty((len(df), transformed.shape[1]), dtype=transformed.dtype)
+            result[start:start + len(transformed)] = transformed
+
+        return result
+
+    except Exception as e:
+        raise CustomException(e, sys)
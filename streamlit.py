@@ -3,6 +3,9 @@ import pandas as pd
 import pickle
 import os
 
+from src.schema import read_csv, apply_schema
+from src.pipeline.predict_pipeline import explain_predictions
+
 # Load the preprocessor
 if os.path.exists('artifacts/proprocessor.pkl'):
     with open('artifacts/proprocessor.pkl', 'rb') as f:
@@ -10,9 +13,10 @@ if os.path.exists('artifacts/proprocessor.pkl'):
 else:
     st.error("⚠️ Preprocessor file not found.")
 
-# Load the model
-if os.path.exists('artifacts/model.pkl'):
-    with open('artifacts/model.pkl', 'rb') as f:
+# Load the model (set MODEL_PATH=artifacts/compact_model.pkl to serve the compacted variant)
+model_path = os.environ.get('MODEL_PATH', 'artifacts/model.pkl')
+if os.path.exists(model_path):
+    with open(model_path, 'rb') as f:
         model = pickle.load(f)
 else:
     st.error("⚠️ Model file not found.")
@@ -70,12 +74,13 @@ def main():
     # Sidebar with upload option and header
     st.sidebar.header("🔧 Upload Data & Settings")
     uploaded_file = st.sidebar.file_uploader("Upload your sales data (CSV)", type="csv")
+    explain = st.sidebar.checkbox("Explain predictions (per-feature contributions)")
 
     # File Preview and Description
     if uploaded_file is not None:
         st.sidebar.markdown("### 📄 Uploaded Data Preview")
         try:
-            data = pd.read_csv(uploaded_file)
+            data = read_csv(uploaded_file)
             st.sidebar.write(data.head())  # Preview the first few rows
 
             # Display Data Summary (e.g., number of rows, stores, date range)
@@ -88,10 +93,17 @@ def main():
             st.sidebar.markdown(data_summary)
 
             with st.spinner('⏳ Processing your file...'):
-                preprocessed_data = preprocess_data(data)
-                if preprocessed_data is not None:
-                    predictions = make_predictions(preprocessed_data)
-                    display_predictions(predictions, data)
+                if explain:
+                    # Contributions add up to the prediction, so one pass gives both
+                    explanation = explain_data(data)
+                    if explanation is not None:
+                        display_predictions(explanation.sum(axis=1).values, data)
+                        display_explanation(explanation, data)
+                else:
+                    preprocessed_data = preprocess_data(data)
+                    if preprocessed_data is not None:
+                        predictions = make_predictions(preprocessed_data)
+                        display_predictions(predictions, data)
         except Exception as e:
             st.sidebar.error(f"⚠️ Error loading file: {str(e)}")
     
@@ -112,7 +124,7 @@ def main():
     # Project owner section at the bottom of the page
     display_project_owner_details()
 
-def preprocess_data(data):
+def prepare_data(data):
     # Select required columns
     columns = ['Store', 'DayOfWeek', 'Date', 'Sales', 'Customers', 'Open', 'Promo',
                'StateHoliday', 'SchoolHoliday', 'StoreType', 'Assortment',
@@ -125,19 +137,43 @@ def preprocess_data(data):
         st.error("⚠️ Missing some required columns in the CSV.")
         return None
     
-    # Convert Date column to datetime
+    # Convert Date column to datetime and cast the rest to the compact schema
     data['Date'] = pd.to_datetime(data['Date'], errors='coerce')
+    return apply_schema(data)
+
+def preprocess_data(data):
+    data = prepare_data(data)
+    if data is None:
+        return None
     
     # Preprocess using the preprocessor
     preprocessed_data = preprocessor.transform(data)
     
     return preprocessed_data
 
+def explain_data(data):
+    data = prepare_data(data)
+    if data is None:
+        return None
+
+    # Contributions of each original column to every prediction along its decision
+    # path in the trees, at about the cost of predicting
+    return explain_predictions(model, preprocessor, data)
+
 def make_predictions(data):
     # Make predictions using the trained model
     predictions = model.predict(data)
     return predictions
 
+def display_explanation(explanation, data):
+    # Each row adds up to the predicted sales together with BaseValue
+    explanation = explanation.copy()
+    explanation.insert(0, 'Store', data['Store'])
+    explanation.insert(1, 'Date', pd.to_datetime(data['Date']))
+
+    st.subheader("🔍 Why the Forecast Moved")
+    st.write(explanation)
+
 def display_predictions(predictions, data):
     # Display predictions along with store number and date
     result_df = pd.DataFrame({
@@ -0,0 +1,29 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.schema import apply_schema
+
+STORE_CSV = os.path.join(os.path.dirname(__file__), os.pardir, "notebook", "data", "store.csv")
+
+
+@pytest.fixture
+def rossmann_df():
+    '''Small synthetic sales history merged with the real store table.'''
+    rng = np.random.default_rng(0)
+    n = 3000
+    sales = pd.DataFrame({
+        'Store': rng.integers(1, 1116, n),
+        'DayOfWeek': rng.integers(1, 8, n),
+        'Date': rng.choice(pd.date_range('2014-01-01', '2014-12-31').strftime('%Y-%m-%d'), n),
+        'Customers': rng.integers(100, 3000, n),
+        'Open': 1,
+        'Promo': rng.integers(0, 2, n),
+        'StateHoliday': rng.choice(['0', 'a'], n),
+        'SchoolHoliday': rng.integers(0, 2, n),
+    })
+    sales['Sales'] = sales['Customers'] * 7 + rng.integers(0, 500, n)
+    df = pd.merge(sales, pd.read_csv(STORE_CSV), on='Store', how='inner')
+    return apply_schema(df)
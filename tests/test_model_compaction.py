@@ -0,0 +1,66 @@
+import numpy as np
+from lightgbm import LGBMRegressor
+
+from src.components.model_compaction import ModelCompaction
+from src.utils import load_object, save_object
+
+
+def make_report(**variants):
+    return {name: {'p50_ms': p99 / 2, 'p99_ms': p99, 'size_kb': size, 'r2': r2}
+            for name, (p99, size, r2) in variants.items()}
+
+
+def test_full_model_is_never_selected():
+    compaction = ModelCompaction()
+    report = make_report(full=(0.25, 12000, 0.990), truncated_100=(0.12, 2700, 0.975))
+
+    assert compaction.select_variant(report) is None
+
+
+def test_fastest_variant_within_tolerance_is_selected():
+    compaction = ModelCompaction()
+    report = make_report(full=(0.25, 12000, 0.990), truncated_50=(0.10, 1400, 0.970),
+                         truncated_200=(0.15, 5500, 0.989), distilled=(0.06, 800, 0.988))
+
+    assert compaction.select_variant(report) == 'distilled'
+
+    compaction.model_compaction_config.latency_budget_ms = 0.05
+    assert compaction.select_variant(report) is None
+
+
+def test_variants_are_scored_and_smaller():
+    rng = np.random.default_rng(0)
+    X = rng.random((2000, 5))
+    y = X @ np.array([5.0, 3.0, 1.0, 0.5, 0.1]) + rng.normal(0, 0.05, 2000)
+    model = LGBMRegressor(n_estimators=120, num_leaves=63, min_child_samples=3, verbose=-1).fit(X, y)
+
+    compaction = ModelCompaction()
+    compaction.model_compaction_config.benchmark_rows = 20
+    variants = compaction.get_compact_variants(model, X)
+    report = {name: compaction.benchmark_variant(variant, X, y) for name, variant in variants.items()}
+
+    assert set(report) == {'full', 'truncated_50', 'truncated_100', 'distilled'}
+    assert report['truncated_50']['size_kb'] < report['full']['size_kb']
+    np.testing.assert_allclose(variants['full'].predict(X), model.predict(X))
+
+
+def test_full_booster_replaces_stale_compact_model(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.random((1000, 4))
+    y = X @ np.array([5.0, 3.0, 1.0, 0.5])
+    train_array = np.c_[X, y]
+    model = LGBMRegressor(n_estimators=60, num_leaves=15, verbose=-1).fit(X, y)
+
+    compaction = ModelCompaction()
+    config = compaction.model_compaction_config
+    config.trained_model_file_path = str(tmp_path / 'model.pkl')
+    config.compact_model_file_path = str(tmp_path / 'compact_model.pkl')
+    config.latency_budget_ms = 0
+    config.benchmark_rows = 5
+    save_object(config.trained_model_file_path, model)
+    save_object(config.compact_model_file_path, 'stale model from an earlier run')
+
+    name, _ = compaction.initiate_model_compaction(train_array, train_array)
+
+    assert name == 'full'
+    np.testing.assert_allclose(load_object(config.compact_model_file_path).predict(X), model.predict(X))
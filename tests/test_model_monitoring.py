@@ -0,0 +1,96 @@
+import copy
+import pickle
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from src.components.model_monitoring import CountMinSketch, InferenceMonitor, RunningMoments
+
+
+def test_running_moments_match_full_pass():
+    values = np.random.default_rng(1).normal(50, 5, 1000)
+    moments = RunningMoments()
+    for batch in np.array_split(values, 7):
+        moments.update(batch)
+    moments.update(np.array([np.nan]))
+
+    assert moments.count == 1000 and moments.missing == 1
+    np.testing.assert_allclose([moments.mean, moments.std], [values.mean(), values.std()])
+
+
+def test_count_min_sketch_never_underestimates():
+    keys = np.random.default_rng(2).integers(1, 1116, 20000)
+    sketch = CountMinSketch(width=256, depth=4)
+    sketch.update(keys)
+
+    true_counts = pd.Series(keys).value_counts()
+    estimates = sketch.query(true_counts.index.to_numpy())
+
+    assert sketch.total == len(keys)
+    assert (estimates >= true_counts.to_numpy()).all()
+
+
+def test_drift_scores_flag_shifted_traffic(rossmann_df):
+    features = rossmann_df.drop(columns=['Sales'])
+    reference = pickle.loads(pickle.dumps(InferenceMonitor.from_training_data(features, rossmann_df['Sales'])))
+
+    same = InferenceMonitor(reference)
+    same.update(features, rossmann_df['Sales'].to_numpy())
+    shifted = InferenceMonitor(reference)
+    shifted_features = features.assign(Customers=features['Customers'] * 3,
+                                       Store=features['Store'].where(features['StoreType'] == 'a', 1))
+    shifted.update(shifted_features, rossmann_df['Sales'].to_numpy() * 3)
+
+    same_scores, shifted_scores = same.drift_scores(), shifted.drift_scores()
+    for column in ['Customers', 'prediction']:
+        assert same_scores[column]['psi'] < 0.01
+        assert shifted_scores[column]['psi'] > 1
+    assert same_scores['Store']['tv_distance'] < 0.1
+    assert shifted_scores['Store']['tv_distance'] > 0.3
+
+
+def test_merged_monitors_match_a_single_monitor(rossmann_df):
+    features = rossmann_df.drop(columns=['Sales'])
+    predictions = rossmann_df['Sales'].to_numpy()
+    reference = InferenceMonitor.from_training_data(features, rossmann_df['Sales'])
+
+    single = InferenceMonitor(reference)
+    single.update(features, predictions)
+    merged = InferenceMonitor(reference)
+    for part in np.array_split(np.arange(len(features)), 3):
+        worker = InferenceMonitor(reference)
+        worker.update(features.iloc[part], predictions[part])
+        merged.merge(pickle.loads(pickle.dumps(worker)))
+
+    for column in single.columns:
+        np.testing.assert_allclose([merged.moments[column].mean, merged.moments[column].std],
+                                   [single.moments[column].mean, single.moments[column].std])
+        np.testing.assert_array_equal(merged.histograms[column].counts, single.histograms[column].counts)
+    np.testing.assert_array_equal(merged.sketches['Store'].table, single.sketches['Store'].table)
+    assert merged.drift_scores() == single.drift_scores()
+
+
+def test_aggregate_merges_snapshots_of_the_same_reference(rossmann_df, tmp_path):
+    features = rossmann_df.drop(columns=['Sales'])
+    predictions = rossmann_df['Sales'].to_numpy()
+    reference_path = tmp_path / 'reference_profile.pkl'
+    with open(reference_path, 'wb') as f:
+        pickle.dump(InferenceMonitor.from_training_data(features, rossmann_df['Sales']), f)
+
+    workers = [InferenceMonitor.from_reference_file(str(reference_path)) for _ in range(2)]
+    for worker in workers:
+        worker.config = replace(worker.config, snapshot_dir=str(tmp_path / 'monitoring'))
+    workers[0].update(features.iloc[:1000], predictions[:1000])
+    workers[0].write_snapshot()
+    workers[1].update(features.iloc[1000:], predictions[1000:])
+    # Snapshot of an earlier reference profile, left out of the aggregate
+    stale = copy.copy(workers[0])
+    stale.snapshot_path, stale.reference_version = None, workers[0].reference_version - 1
+    stale.write_snapshot()
+
+    aggregated = workers[1].aggregate()
+
+    assert aggregated.moments['Customers'].count == len(features)
+    assert aggregated.sketches['Store'].total == len(features)
+    assert len(list((tmp_path / 'monitoring').glob('*.pkl'))) == 3
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from lightgbm import LGBMRegressor
+
+from src.components.data_transformation import DataTransformation
+from src.pipeline.predict_pipeline import explain_predictions, get_feature_origins
+
+
+@pytest.mark.parametrize('method', ['path', 'shap'])
+def test_contributions_sum_to_prediction(rossmann_df, method):
+    features = rossmann_df.drop(columns=['Sales'])
+    preprocessor = DataTransformation().get_data_transformer_object()
+    X = preprocessor.fit_transform(features)
+    model = LGBMRegressor(n_estimators=20, num_leaves=15, verbose=-1).fit(X, rossmann_df['Sales'])
+
+    explanation = explain_predictions(model, preprocessor, features, method=method)
+
+    assert list(explanation.columns) == ['Customers', 'CompetitionDistance', 'CompetitionOpenSinceYear',
+                                         'PromoInterval', 'StoreType', 'Assortment', 'BaseValue']
+    np.testing.assert_allclose(explanation.sum(axis=1), model.predict(X), atol=1e-6)
+
+
+def test_path_contributions_follow_shap(rossmann_df):
+    features = rossmann_df.drop(columns=['Sales'])
+    preprocessor = DataTransformation().get_data_transformer_object()
+    X = preprocessor.fit_transform(features)
+    model = LGBMRegressor(n_estimators=20, num_leaves=15, verbose=-1).fit(X, rossmann_df['Sales'])
+
+    path = explain_predictions(model, preprocessor, features, method='path')
+    shap = explain_predictions(model, preprocessor, features, method='shap')
+
+    # Both attribute almost all the variation to Customers, row by row
+    assert np.corrcoef(path['Customers'], shap['Customers'])[0, 1] > 0.99
+
+
+def test_feature_origins_expand_one_hot_columns(rossmann_df):
+    preprocessor = DataTransformation().get_data_transformer_object().fit(rossmann_df.drop(columns=['Sales']))
+
+    origins = get_feature_origins(preprocessor)
+
+    assert origins.count('StoreType') == 4
+    assert origins.count('PromoInterval') == 3
+    assert len(origins) == preprocessor.transform(rossmann_df.drop(columns=['Sales'])).shape[1]
@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+
+from src.exception import CustomException
+from src.schema import apply_schema
+
+
+def test_blank_values_survive_the_cast():
+    df = apply_schema(pd.DataFrame({'Store': [1, 2], 'Sales': [None, 5263], 'Customers': [555, None],
+                                    'Open': [1, None], 'StateHoliday': ['0', 'a']}))
+
+    assert df['Sales'].isna().tolist() == [True, False]
+    assert df['Customers'].isna().tolist() == [False, True]
+    assert df['Open'].dtype == 'Int8'
+    assert df['StateHoliday'].tolist() == [0, 1]
+
+
+def test_unknown_category_is_rejected():
+    with pytest.raises(CustomException, match="Unknown StoreType"):
+        apply_schema(pd.DataFrame({'StoreType': ['a', 'e']}))
+
+    # Genuinely missing values are left for the imputer
+    assert apply_schema(pd.DataFrame({'PromoInterval': ['Jan,Apr,Jul,Oct', None]}))['PromoInterval'].isna().sum() == 1
@@ -0,0 +1,52 @@
+import os
+import pickle
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+from lightgbm import LGBMRegressor
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), os.pardir)
+
+# Mirrors the gunicorn master: apply the config, unpickle the model, fork a worker
+FORK_AND_PREDICT = textwrap.dedent('''
+    import os, pickle, runpy, sys, time
+    config = runpy.run_path('gunicorn.conf.py')
+    assert os.environ['OMP_NUM_THREADS'] == '1' and config['_threads_per_worker'] == 4
+
+    import numpy as np
+    with open(sys.argv[1], 'rb') as f:
+        booster = pickle.load(f)
+    X = np.random.default_rng(0).random((2000, 5))
+
+    pid = os.fork()
+    if pid == 0:
+        booster.predict(X, num_threads=config['_threads_per_worker'])
+        os._exit(0)
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            sys.exit(os.waitstatus_to_exitcode(status))
+        time.sleep(0.1)
+    os.kill(pid, 9)
+    sys.exit('forked worker hung in predict')
+''')
+
+
+def fork_and_predict(model_path):
+    env = {**os.environ, 'OMP_NUM_THREADS': '4', 'WEB_CONCURRENCY': '1'}
+    env.pop('PREDICT_NUM_THREADS', None)
+    return subprocess.run([sys.executable, '-c', FORK_AND_PREDICT, model_path], cwd=REPO_ROOT, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def test_forked_worker_predicts_with_several_threads(tmp_path):
+    X = np.random.default_rng(0).random((2000, 5))
+    model_path = str(tmp_path / 'model.pkl')
+    with open(model_path, 'wb') as f:
+        pickle.dump(LGBMRegressor(n_estimators=50, verbose=-1).fit(X, X.sum(axis=1)).booster_, f)
+
+    result = fork_and_predict(model_path)
+    assert result.returncode == 0, result.stderr
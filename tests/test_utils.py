@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.data_transformation import DataTransformation
+from src.utils import iter_chunks, stratified_reservoir_sample, transform_in_chunks
+
+
+def test_stratified_reservoir_sample_allocates_proportionally():
+    df = pd.DataFrame({'StoreType': ['a'] * 600 + ['b'] * 300 + ['c'] * 99 + ['d'], 'value': range(1000)})
+
+    sample = stratified_reservoir_sample(iter_chunks(df, 128), sample_size=100, strata_cols=['StoreType'])
+
+    assert sample['StoreType'].value_counts().to_dict() == {'a': 60, 'b': 30, 'c': 10, 'd': 1}
+    # Sampled rows are real rows, drawn without replacement
+    assert sample['value'].is_unique
+    assert (df.loc[sample['value'], 'StoreType'].values == sample['StoreType'].values).all()
+
+
+def test_single_row_stratum_is_kept():
+    df = pd.DataFrame({'StoreType': ['a'] * 10000 + ['b'], 'value': range(10001)})
+
+    sample = stratified_reservoir_sample(iter_chunks(df, 1000), sample_size=50, strata_cols=['StoreType'])
+
+    assert sample.loc[sample['StoreType'] == 'b', 'value'].tolist() == [10000]
+
+
+def test_chunked_transform_matches_full_transform(rossmann_df):
+    features = rossmann_df.drop(columns=['Sales'])
+    preprocessor = DataTransformation().get_data_transformer_object().fit(features)
+
+    np.testing.assert_allclose(transform_in_chunks(preprocessor, features, 700), preprocessor.transform(features))
+
+
+def test_fit_drift_compares_outputs_on_probe_rows(rossmann_df):
+    features = rossmann_df.drop(columns=['Sales'])
+    data_transformation = DataTransformation()
+    full = data_transformation.get_data_transformer_object().fit(features)
+    sample = features.sample(500, random_state=0)
+    sampled = data_transformation.get_data_transformer_object().fit(sample)
+    probe = features.drop(index=sample.index)
+
+    drift = data_transformation.get_fit_drift(sampled, full, probe)
+
+    output_diff = np.abs(sampled.transform(probe) - full.transform(probe))
+    assert drift['output_max_abs'] == pytest.approx(output_diff.max())
+    assert drift['output_mean_abs'] == pytest.approx(output_diff.mean())
+    assert all(value == 0 for value in data_transformation.get_fit_drift(full, full, probe).values())
+
+
+def test_sampled_fit_matches_full_fit(rossmann_df):
+    features = rossmann_df.drop(columns=['Sales'])
+    data_transformation = DataTransformation()
+    data_transformation.data_transformation_config.fit_sample_size = 1000
+    data_transformation.data_transformation_config.chunk_size = 400
+    data_transformation.data_transformation_config.report_fit_drift = True
+
+    sampled = data_transformation.fit_transform_sampled(data_transformation.get_data_transformer_object(), features)
+    full = data_transformation.get_data_transformer_object().fit_transform(features)
+
+    assert sampled.shape == full.shape
+    # MinMax bounds from a sample can miss extreme rows (e.g. a CompetitionOpenSinceYear
+    # of 1900), which shifts that whole column slightly, so bound the bulk of the outputs
+    assert np.abs(sampled - full).mean() < 0.01
+    assert np.quantile(np.abs(sampled - full), 0.99) < 0.1
+
+
+def test_initiate_data_transformation_with_fit_sample_size(rossmann_df, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rossmann_df[:2400].to_csv('train.csv', index=False)
+    rossmann_df[2400:].to_csv('test.csv', index=False)
+
+    data_transformation = DataTransformation()
+    full_train, full_test, _ = data_transformation.initiate_data_transformation('train.csv', 'test.csv')
+    data_transformation.data_transformation_config.fit_sample_size = 800
+    train_arr, test_arr, preprocessor_path = data_transformation.initiate_data_transformation('train.csv', 'test.csv')
+
+    assert (tmp_path / preprocessor_path).exists()
+    np.testing.assert_array_equal(train_arr[:, -1], full_train[:, -1])
+    assert np.abs(train_arr[:, :-1] - full_train[:, :-1]).mean() < 0.01
+    assert np.abs(test_arr[:, :-1] - full_test[:, :-1]).mean() < 0.01